@@ -12,9 +12,17 @@ EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "nomic-embed-text")
 # OpenRouter / DeepSeek (chat)
 OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY", "")
 OPENROUTER_MODEL = os.getenv("OPENROUTER_MODEL", "deepseek/deepseek-r1-0528:free")
+OPENROUTER_BASE_URL = os.getenv("OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1")
 YOUR_SITE_URL = os.getenv("YOUR_SITE_URL", "http://localhost:8000")
 YOUR_SITE_NAME = os.getenv("YOUR_SITE_NAME", "Student Chatbot")
 
+# Pool HTTP partagé pour le client LLM
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "50"))
+LLM_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("LLM_MAX_KEEPALIVE_CONNECTIONS", "20"))
+LLM_KEEPALIVE_EXPIRY = float(os.getenv("LLM_KEEPALIVE_EXPIRY", "60"))
+LLM_CONNECT_TIMEOUT = float(os.getenv("LLM_CONNECT_TIMEOUT", "10"))
+LLM_READ_TIMEOUT = float(os.getenv("LLM_READ_TIMEOUT", "120"))
+
 # Chroma
 COLLECTION_NAME = os.getenv("COLLECTION_NAME", "ensa_chatbot")
 DATABASE_LOCATION = os.getenv("DATABASE_LOCATION", "./chroma_db")
@@ -23,3 +31,9 @@ DATABASE_LOCATION = os.getenv("DATABASE_LOCATION", "./chroma_db")
 SECRET_KEY = os.getenv("SECRET_KEY", "ayaayaaya")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 150  
+
+# Uploads
+UPLOAD_DIR = os.getenv("UPLOAD_DIR", "./uploads")
+MAX_UPLOAD_SIZE_MB = int(os.getenv("MAX_UPLOAD_SIZE_MB", "25"))
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+ALLOWED_UPLOAD_EXTENSIONS = {".pdf", ".doc", ".docx", ".ppt", ".pptx"}
@@ -6,6 +6,11 @@ engine = create_engine(DATABASE_URL, echo=False)
 def init_db():
     """Créer les tables au démarrage."""
     SQLModel.metadata.create_all(engine)
+    # create_all n'ajoute pas les index aux tables déjà existantes :
+    # on crée ceux qui manquent (ex: message.conversation_id, conversation.user_id)
+    for table in SQLModel.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(engine, checkfirst=True)
 
 def get_session():
     """Dépendance FastAPI pour obtenir une session DB."""
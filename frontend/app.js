@@ -6,6 +6,10 @@ let currentUserEmail = null;
 
 let ws = null;
 let currentConversationId = null;
+let loadedConversations = []; // Pages de conversations déjà chargées (sidebar)
+let conversationsNextCursor = null;
+let conversationsTotal = 0;
+const CONVERSATIONS_PAGE_MAX = 100; // plafond de `limit` côté API
 
 // Gestion du stream
 let streamingBubble = null; // La bulle en cours de rédaction par le bot
@@ -220,9 +224,9 @@ function stopStreamWatcher() {
 }
 
 // ================== CONVERSATIONS ==================
-function renderConversations(convs) {
+function renderConversations(convs, nextCursor, total) {
   historyList.innerHTML = "";
-  historyCount.textContent = String(convs.length);
+  historyCount.textContent = String(total);
 
   convs.forEach((c) => {
     const item = document.createElement("div");
@@ -230,8 +234,9 @@ function renderConversations(convs) {
     const isActive = c.id === currentConversationId;
 
     item.innerHTML = `
-      <div class="hist-who">${isActive ? "✅ Conversation" : "Conversation"}</div>
+      <div class="hist-who">${isActive ? "✅ Conversation" : "Conversation"} · ${c.message_count} msg</div>
       <div class="hist-txt">${escapeHtml(c.title || "Sans titre")}</div>
+      ${c.last_message_preview ? `<div class="hist-preview">${escapeHtml(c.last_message_preview)}</div>` : ""}
       <button class="hist-del" title="Supprimer" aria-label="Supprimer">🗑</button>
     `;
 
@@ -272,15 +277,48 @@ function renderConversations(convs) {
 
     historyList.appendChild(item);
   });
+
+  if (nextCursor) {
+    const more = document.createElement("button");
+    more.className = "hist-more";
+    more.textContent = "Voir plus";
+    more.addEventListener("click", async () => {
+      try {
+        const page = await apiGet(`/conversations?cursor=${encodeURIComponent(nextCursor)}`);
+        loadedConversations = loadedConversations.concat(page.items);
+        conversationsNextCursor = page.next_cursor;
+        conversationsTotal = page.total;
+        renderConversations(loadedConversations, conversationsNextCursor, conversationsTotal);
+      } catch (e) {
+        console.error(e);
+      }
+    });
+    historyList.appendChild(more);
+  }
 }
 
+// Rafraîchit la sidebar en gardant au moins autant de conversations que déjà chargées
 async function loadConversations() {
   try {
-    const convs = await apiGet("/conversations");
+    const wanted = Math.max(30, loadedConversations.length);
+    let convs = [];
+    let cursor = null;
+    let page;
+    do {
+      const limit = Math.min(CONVERSATIONS_PAGE_MAX, wanted - convs.length);
+      const query = cursor ? `&cursor=${encodeURIComponent(cursor)}` : "";
+      page = await apiGet(`/conversations?limit=${limit}${query}`);
+      convs = convs.concat(page.items);
+      cursor = page.next_cursor;
+    } while (cursor && convs.length < wanted);
+
     if (!currentConversationId && convs.length > 0) {
       currentConversationId = convs[0].id;
     }
-    renderConversations(convs);
+    loadedConversations = convs;
+    conversationsNextCursor = cursor;
+    conversationsTotal = page.total;
+    renderConversations(convs, conversationsNextCursor, conversationsTotal);
     return convs;
   } catch(e) {
     console.error(e);
@@ -323,7 +361,8 @@ async function selectConversation(conversationId) {
   resetStreamState(); // Stop tout stream en cours sur l'ancienne conv
   currentConversationId = conversationId;
   
-  await loadConversations();
+  // Pas de rechargement : on garde les pages déjà chargées, seul le marqueur actif bouge
+  renderConversations(loadedConversations, conversationsNextCursor, conversationsTotal);
   await loadMessagesForCurrentConversation();
   connectWebSocket();
 }
@@ -431,6 +470,9 @@ logoutBtn.addEventListener("click", () => {
   clearChatUI();
   historyList.innerHTML = "";
   historyCount.textContent = "0";
+  loadedConversations = [];
+  conversationsNextCursor = null;
+  conversationsTotal = 0;
   showAuthScreen();
 });
 // ================== GESTION INSCRIPTION & BASCULEMENT ==================
@@ -596,7 +638,9 @@ uploadForm.addEventListener("submit", async (e) => {
       return;
     }
     const data = await res.json();
-    uploadStatusEl.textContent = `✅ Indexé (${data.chunks} chunks)`;
+    uploadStatusEl.textContent = data.status === "duplicate"
+      ? "ℹ️ Document déjà indexé"
+      : `✅ Indexé (${data.chunks} chunks)`;
     fileInput.value = "";
   } catch (err) {
     console.error(err);
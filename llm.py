@@ -0,0 +1,152 @@
+import asyncio
+from typing import AsyncGenerator, Dict, List, Tuple, Optional
+
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+from config import (
+    OPENROUTER_API_KEY,
+    OPENROUTER_MODEL,
+    OPENROUTER_BASE_URL,
+    YOUR_SITE_URL,
+    YOUR_SITE_NAME,
+    LLM_MAX_CONNECTIONS,
+    LLM_MAX_KEEPALIVE_CONNECTIONS,
+    LLM_KEEPALIVE_EXPIRY,
+    LLM_CONNECT_TIMEOUT,
+    LLM_READ_TIMEOUT,
+)
+
+###############################
+# CLIENT OPENROUTER / DEEPSEEK
+###############################
+
+# Pool de connexions partagé (keep-alive) : évite un handshake TLS par question.
+# DefaultAsyncHttpxClient garde les réglages par défaut du SDK (redirections...).
+http_client = DefaultAsyncHttpxClient(
+    limits=httpx.Limits(
+        max_connections=LLM_MAX_CONNECTIONS,
+        max_keepalive_connections=LLM_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=LLM_KEEPALIVE_EXPIRY,
+    ),
+    timeout=httpx.Timeout(LLM_READ_TIMEOUT, connect=LLM_CONNECT_TIMEOUT),
+)
+
+client = AsyncOpenAI(
+    base_url=OPENROUTER_BASE_URL,
+    api_key=OPENROUTER_API_KEY,
+    http_client=http_client,
+)
+
+###############################
+# SINGLE-FLIGHT (STREAMS PARTAGÉS)
+###############################
+
+class _SharedStream:
+    """
+    Flux LLM partagé entre plusieurs abonnés (single-flight).
+    Les tokens déjà émis sont conservés pour être rejoués aux retardataires.
+    L'appel amont est annulé quand le dernier abonné s'en va.
+    """
+
+    def __init__(self, key: Tuple[str, str, float]) -> None:
+        self.key = key
+        self.chunks: List[str] = []
+        self.done = False
+        self.error: Optional[Exception] = None
+        self.subscribers = 0
+        self.task: Optional[asyncio.Task] = None
+        self._cond = asyncio.Condition()
+
+    async def publish(self, chunk: str) -> None:
+        async with self._cond:
+            self.chunks.append(chunk)
+            self._cond.notify_all()
+
+    async def close(self, error: Optional[Exception] = None) -> None:
+        async with self._cond:
+            self.error = error
+            self.done = True
+            self._cond.notify_all()
+
+    async def subscribe(self) -> AsyncGenerator[str, None]:
+        self.subscribers += 1
+        try:
+            i = 0
+            while True:
+                async with self._cond:
+                    await self._cond.wait_for(lambda: i < len(self.chunks) or self.done)
+                    new_chunks = self.chunks[i:]
+                    done, error = self.done, self.error
+                for chunk in new_chunks:
+                    yield chunk
+                i += len(new_chunks)
+                if done and i >= len(self.chunks):
+                    if error:
+                        # Exception neuve par abonné : l'originale reste intacte
+                        raise RuntimeError("Échec du flux LLM") from error
+                    return
+        finally:
+            self.subscribers -= 1
+            if self.subscribers == 0 and not self.done:
+                # Plus personne n'écoute (websocket fermée, générateur abandonné)
+                if _inflight.get(self.key) is self:
+                    del _inflight[self.key]
+                if self.task:
+                    self.task.cancel()
+
+# (system_prompt, user_prompt, temperature) -> flux en cours
+_inflight: Dict[Tuple[str, str, float], _SharedStream] = {}
+
+async def _stream_llm_upstream(system_prompt: str, user_prompt: str, temperature: float) -> AsyncGenerator[str, None]:
+    stream = await client.chat.completions.create(
+        model=OPENROUTER_MODEL,
+        messages=[
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt},
+        ],
+        temperature=temperature,
+        stream=True,
+        extra_headers={
+            "HTTP-Referer": YOUR_SITE_URL,
+            "X-Title": YOUR_SITE_NAME,
+        },
+    )
+
+    try:
+        async for event in stream:
+            delta = event.choices[0].delta
+            if delta and delta.content:
+                yield delta.content
+    finally:
+        # Ferme la réponse HTTP (et libère la connexion du pool) même si annulé
+        await stream.close()
+
+async def _run_shared_stream(shared: _SharedStream) -> None:
+    error: Optional[Exception] = None
+    upstream = _stream_llm_upstream(*shared.key)
+    try:
+        async for tok in upstream:
+            await shared.publish(tok)
+    except Exception as e:
+        error = e
+    finally:
+        await upstream.aclose()
+        # Retirer d'abord : une nouvelle question identique relance un appel frais
+        if _inflight.get(shared.key) is shared:
+            del _inflight[shared.key]
+        await shared.close(error)
+
+async def stream_llm(system_prompt: str, user_prompt: str, temperature: float) -> AsyncGenerator[str, None]:
+    """
+    Les tours concurrents avec le même prompt partagent un seul appel amont.
+    """
+    key = (system_prompt, user_prompt, temperature)
+    shared = _inflight.get(key)
+    if shared is None:
+        shared = _SharedStream(key)
+        _inflight[key] = shared
+        shared.task = asyncio.create_task(_run_shared_stream(shared))
+
+    async for tok in shared.subscribe():
+        yield tok
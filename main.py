@@ -1,13 +1,15 @@
 import os
-import shutil
+import hashlib
+import tempfile
 from typing import Optional, List
 from datetime import datetime, timedelta
 
 from fastapi import (
     FastAPI, UploadFile, File, WebSocket, WebSocketDisconnect,
-    Depends, HTTPException, status, Query
+    Depends, HTTPException, status, Query, Request
 )
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from fastapi.security import OAuth2PasswordBearer
 
 from jose import JWTError, jwt
@@ -22,12 +24,17 @@ from models import User, Message, Conversation
 from utils import (
     create_conversation,
     list_conversations,
+    count_conversations,
     get_conversation,
     get_history_texts,
 )
 
-from rag import ingest_pdf, rag_answer
-from config import SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES
+from rag import IngestionError, ingest_pdf, is_already_indexed, rag_answer
+from llm import http_client
+from config import (
+    SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES,
+    UPLOAD_DIR, MAX_UPLOAD_SIZE_MB, UPLOAD_CHUNK_SIZE, ALLOWED_UPLOAD_EXTENSIONS,
+)
 
 
 pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
@@ -35,6 +42,33 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
 app = FastAPI(title="Chatbot Étudiant ENSA - Backend")
 
+MAX_UPLOAD_BYTES = MAX_UPLOAD_SIZE_MB * 1024 * 1024
+MULTIPART_OVERHEAD_BYTES = 64 * 1024  # en-têtes et séparateurs multipart
+
+
+# Déclaré avant CORS pour que CORS enveloppe aussi les réponses 411/413
+@app.middleware("http")
+async def limit_upload_size(request: Request, call_next):
+    """
+    Rejette les uploads trop gros AVANT que Starlette ne lise le corps
+    (sinon tout le fichier est reçu et écrit sur disque avant le 413).
+    """
+    if request.method == "POST" and request.url.path == "/ingest-pdf":
+        content_length = request.headers.get("content-length")
+        if content_length is None:
+            return JSONResponse(status_code=411, content={"detail": "En-tête Content-Length requis"})
+        try:
+            length = int(content_length)
+        except ValueError:
+            return JSONResponse(status_code=400, content={"detail": "Content-Length invalide"})
+        if length > MAX_UPLOAD_BYTES + MULTIPART_OVERHEAD_BYTES:
+            return JSONResponse(
+                status_code=413,
+                content={"detail": f"Fichier trop volumineux (max {MAX_UPLOAD_SIZE_MB} Mo)"},
+            )
+    return await call_next(request)
+
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],  # En production, remplace * par l'URL de ton frontend
@@ -49,6 +83,11 @@ def on_startup():
     init_db()
 
 
+@app.on_event("shutdown")
+async def on_shutdown():
+    await http_client.aclose()
+
+
 # =========================
 # Schemas
 # =========================
@@ -80,6 +119,20 @@ class ConversationCreate(BaseModel):
     title: Optional[str] = None
 
 
+class ConversationSummary(BaseModel):
+    id: int
+    title: str
+    message_count: int
+    last_message_preview: Optional[str] = None
+    last_message_at: Optional[datetime] = None
+
+
+class ConversationPage(BaseModel):
+    items: List[ConversationSummary]
+    next_cursor: Optional[str] = None
+    total: int
+
+
 # =========================
 # Auth helpers
 # =========================
@@ -174,28 +227,75 @@ async def ingest_pdf_endpoint(
     file: UploadFile = File(...),
     current_user: User = Depends(get_current_user) # Sécurité ajoutée : il faut être connecté
 ):
-    temp_dir = "uploads"
-    os.makedirs(temp_dir, exist_ok=True)
-    temp_path = os.path.join(temp_dir, file.filename)
+    filename = os.path.basename(file.filename or "")
+    ext = os.path.splitext(filename)[1].lower()
+    if ext not in ALLOWED_UPLOAD_EXTENSIONS:
+        raise HTTPException(status_code=400, detail=f"Extension de fichier non supportée: {ext}")
+
+    # Le Content-Length inclut l'enveloppe multipart : taille exacte du fichier ici
+    if file.size is not None and file.size > MAX_UPLOAD_BYTES:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Fichier trop volumineux (max {MAX_UPLOAD_SIZE_MB} Mo)",
+        )
 
-    with open(temp_path, "wb") as f:
-        shutil.copyfileobj(file.file, f)
+    os.makedirs(UPLOAD_DIR, exist_ok=True)
+
+    # Fichier temporaire unique : deux uploads du même nom ne s'écrasent plus.
+    # Starlette a déjà mis le corps en spool (mémoire ou disque, sans chemin
+    # garanti) : une copie vers un vrai fichier reste nécessaire pour les loaders,
+    # on en profite pour calculer le hash dans la même passe.
+    fd, temp_path = tempfile.mkstemp(suffix=ext, dir=UPLOAD_DIR)
+    try:
+        hasher = hashlib.sha256()
+        with os.fdopen(fd, "wb") as f:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                hasher.update(chunk)
+                f.write(chunk)
 
-    nb_chunks = ingest_pdf(temp_path, source_name=file.filename)
-    return {"status": "ok", "file": file.filename, "chunks": nb_chunks}
+        content_hash = hasher.hexdigest()
+        if is_already_indexed(content_hash):
+            return {"status": "duplicate", "file": filename, "chunks": 0}
+
+        try:
+            nb_chunks = ingest_pdf(temp_path, source_name=filename, content_hash=content_hash)
+        except IngestionError as e:
+            raise HTTPException(status_code=500, detail=str(e))
+        return {"status": "ok", "file": filename, "chunks": nb_chunks}
+    finally:
+        os.remove(temp_path)
 
 
 # =========================
 # Conversations API
 # =========================
 
-@app.get("/conversations")
+@app.get("/conversations", response_model=ConversationPage)
 def api_list_conversations(
+    limit: int = Query(30, ge=1, le=100),
+    cursor: Optional[str] = None,
     session: Session = Depends(get_session),
     current_user: User = Depends(get_current_user),
 ):
-    convs = list_conversations(session, current_user.id)
-    return [{"id": c.id, "title": c.title} for c in convs]
+    try:
+        rows, next_cursor = list_conversations(session, current_user.id, limit=limit, cursor=cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Curseur invalide")
+
+    return ConversationPage(
+        items=[
+            ConversationSummary(
+                id=r.id,
+                title=r.title,
+                message_count=r.message_count,
+                last_message_preview=r.last_message_preview,
+                last_message_at=r.last_message_at,
+            )
+            for r in rows
+        ],
+        next_cursor=next_cursor,
+        total=count_conversations(session, current_user.id),
+    )
 
 
 @app.post("/conversations")
@@ -13,7 +13,7 @@ class User(SQLModel, table=True):
 
 class Conversation(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
-    user_id: int = Field(foreign_key="user.id")
+    user_id: int = Field(foreign_key="user.id", index=True)
     title: str = Field(default="Nouvelle conversation")
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
@@ -23,7 +23,7 @@ class Conversation(SQLModel, table=True):
 
 class Message(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
-    conversation_id: int = Field(foreign_key="conversation.id")
+    conversation_id: int = Field(foreign_key="conversation.id", index=True)
 
     sender: str  # "user" ou "assistant"
     content: str
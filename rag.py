@@ -1,5 +1,6 @@
 import os
 import re
+import mmap
 from typing import AsyncGenerator, List, Tuple, Optional
 
 from langchain_ollama import OllamaEmbeddings
@@ -11,27 +12,15 @@ from langchain_community.document_loaders import (
     UnstructuredPowerPointLoader,
 )
 from langchain_core.documents import Document
-
-from openai import AsyncOpenAI
+from pypdf import PdfReader
 
 from config import (
     EMBEDDING_MODEL,
     COLLECTION_NAME,
     DATABASE_LOCATION,
     OPENROUTER_API_KEY,
-    OPENROUTER_MODEL,
-    YOUR_SITE_URL,
-    YOUR_SITE_NAME,
-)
-
-###############################
-# CLIENT OPENROUTER / DEEPSEEK
-###############################
-
-client = AsyncOpenAI(
-    base_url="https://openrouter.ai/api/v1",
-    api_key=OPENROUTER_API_KEY,
 )
+from llm import stream_llm
 
 ###############################
 # INITIALISATION RAG
@@ -91,26 +80,6 @@ def _wants_sources(text: str) -> bool:
 # HELPERS (LLM CALLS)
 ###############################
 
-async def _stream_llm(system_prompt: str, user_prompt: str, temperature: float) -> AsyncGenerator[str, None]:
-    stream = await client.chat.completions.create(
-        model=OPENROUTER_MODEL,
-        messages=[
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt},
-        ],
-        temperature=temperature,
-        stream=True,
-        extra_headers={
-            "HTTP-Referer": YOUR_SITE_URL,
-            "X-Title": YOUR_SITE_NAME,
-        },
-    )
-
-    async for event in stream:
-        delta = event.choices[0].delta
-        if delta and delta.content:
-            yield delta.content
-
 async def _fallback_chat(question: str, history: List[str]) -> AsyncGenerator[str, None]:
     """
     Réponse normale (style ChatGPT) quand pas de contexte pertinent.
@@ -129,27 +98,55 @@ async def _fallback_chat(question: str, history: List[str]) -> AsyncGenerator[st
 {question}
 """.strip()
 
-    async for tok in _stream_llm(system_prompt, user_prompt, temperature=0.4):
+    async for tok in stream_llm(system_prompt, user_prompt, temperature=0.4):
         yield tok
 
 ###############################
 # INGESTION DE FICHIERS
 ###############################
 
-def ingest_pdf(file_path: str, source_name: str) -> int:
+class IngestionError(Exception):
+    """Ingestion incomplète : aucun chunk du fichier n'a été conservé."""
+
+def _load_pdf_mmap(file_path: str) -> List[Document]:
+    """
+    Lit un PDF via memory mapping (pas de copie du fichier en mémoire).
+    Même format de sortie que PyPDFLoader : un Document par page.
+    """
+    with open(file_path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            reader = PdfReader(mm)
+            return [
+                Document(
+                    page_content=page.extract_text() or "",
+                    metadata={"source": file_path, "page": i},
+                )
+                for i, page in enumerate(reader.pages)
+            ]
+
+def is_already_indexed(content_hash: str) -> bool:
+    """
+    Vrai si un fichier avec le même hash (contenu identique) est déjà dans Chroma.
+    """
+    found = vector_store.get(where={"content_hash": content_hash}, limit=1)
+    return bool(found.get("ids"))
+
+def ingest_pdf(file_path: str, source_name: str, content_hash: Optional[str] = None) -> int:
     ext = os.path.splitext(source_name)[1].lower()
 
     if ext == ".pdf":
-        loader = PyPDFLoader(file_path)
+        try:
+            docs = _load_pdf_mmap(file_path)
+        except (ValueError, OSError):
+            # mmap impossible (fichier vide, FS non supporté...) -> lecture classique
+            docs = PyPDFLoader(file_path).load()
     elif ext in [".doc", ".docx"]:
-        loader = UnstructuredWordDocumentLoader(file_path)
+        docs = UnstructuredWordDocumentLoader(file_path).load()
     elif ext in [".ppt", ".pptx"]:
-        loader = UnstructuredPowerPointLoader(file_path)
+        docs = UnstructuredPowerPointLoader(file_path).load()
     else:
         raise ValueError(f"Extension de fichier non supportée: {ext}")
 
-    docs = loader.load()
-
     splitter = RecursiveCharacterTextSplitter(
         chunk_size=1000,
         chunk_overlap=200,
@@ -158,18 +155,30 @@ def ingest_pdf(file_path: str, source_name: str) -> int:
 
     for d in splits:
         d.metadata["source"] = source_name
+        if content_hash:
+            d.metadata["content_hash"] = content_hash
 
-    total_inserted = 0
+    inserted_ids: List[str] = []
+    failed = 0
     for idx, doc in enumerate(splits):
         try:
-            vector_store.add_documents([doc])
-            total_inserted += 1
-            print(f"Chunk {idx+1}/{len(splits)} OK (total={total_inserted})")
+            inserted_ids.extend(vector_store.add_documents([doc]))
+            print(f"Chunk {idx+1}/{len(splits)} OK (total={len(inserted_ids)})")
         except Exception as e:
+            failed += 1
             print(f"❌ Erreur sur le chunk {idx+1}/{len(splits)}: {e}")
 
-    print(f"Ingestion terminée : {total_inserted} chunks insérés sur {len(splits)}")
-    return total_inserted
+    if failed:
+        # Tout ou rien : un index partiel porterait le hash et bloquerait
+        # toute ré-ingestion du même fichier (vu comme "duplicate").
+        if inserted_ids:
+            vector_store.delete(ids=inserted_ids)
+        raise IngestionError(
+            f"Ingestion annulée : {failed} chunk(s) en erreur sur {len(splits)}, réessayez l'upload"
+        )
+
+    print(f"Ingestion terminée : {len(inserted_ids)} chunks insérés sur {len(splits)}")
+    return len(inserted_ids)
 
 ###############################
 # RAG ANSWER (STREAMING)
@@ -267,5 +276,5 @@ async def rag_answer(
 """.strip()
 
     # 6) Envoi au LLM
-    async for tok in _stream_llm(system_prompt, user_prompt, temperature=0.2):
+    async for tok in stream_llm(system_prompt, user_prompt, temperature=0.2):
         yield tok
\ No newline at end of file
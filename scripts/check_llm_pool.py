@@ -0,0 +1,131 @@
+"""
+Vérifie le client LLM contre un serveur local compatible OpenAI (stub SSE).
+
+    python scripts/check_llm_pool.py
+
+Contrôles :
+- les tokens streamés arrivent bien via stream_llm ;
+- le pool httpx configuré est celui utilisé par le SDK (limites, timeouts) ;
+- les connexions keep-alive sont réutilisées entre requêtes successives ;
+- des questions identiques concurrentes ne font qu'un seul appel amont ;
+- un abonné qui abandonne le flux annule l'appel amont.
+"""
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+TOKENS = ["Bon", "jour", " les", " ENSA"]
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def setup(self):
+        super().setup()
+        self.server.connections += 1
+
+    def log_message(self, *args):
+        pass
+
+    def _write_chunk(self, data: bytes):
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+    def do_POST(self):
+        if self.path != "/chat/completions":
+            self.send_error(404)
+            return
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        self.server.requests.append(json.loads(body))
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            for tok in TOKENS:
+                event = {
+                    "id": "stub",
+                    "object": "chat.completion.chunk",
+                    "created": 0,
+                    "model": "stub",
+                    "choices": [{"index": 0, "delta": {"content": tok}, "finish_reason": None}],
+                }
+                self._write_chunk(f"data: {json.dumps(event)}\n\n".encode())
+                time.sleep(0.05)
+            self._write_chunk(b"data: [DONE]\n\n")
+            self._write_chunk(b"")
+        except (BrokenPipeError, ConnectionResetError):
+            self.server.aborted += 1
+            self.close_connection = True
+
+
+def start_stub() -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.connections = 0
+    server.requests = []
+    server.aborted = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+async def collect(llm, user_prompt: str) -> str:
+    return "".join([tok async for tok in llm.stream_llm("system", user_prompt, 0.2)])
+
+
+async def run_checks(llm, server: ThreadingHTTPServer) -> None:
+    import config
+
+    # Le SDK utilise bien notre pool configuré
+    assert llm.client._client is llm.http_client
+    pool = llm.http_client._transport._pool
+    assert pool._max_connections == config.LLM_MAX_CONNECTIONS
+    assert pool._max_keepalive_connections == config.LLM_MAX_KEEPALIVE_CONNECTIONS
+    assert llm.http_client.timeout.connect == config.LLM_CONNECT_TIMEOUT
+    assert llm.http_client.timeout.read == config.LLM_READ_TIMEOUT
+
+    # Tokens streamés + réutilisation keep-alive (une seule connexion TCP)
+    for i in range(3):
+        assert await collect(llm, f"question {i}") == "".join(TOKENS)
+    assert len(server.requests) == 3, server.requests
+    assert server.connections == 1, f"{server.connections} connexions ouvertes"
+    print("OK  stream + keep-alive : 3 requêtes sur 1 connexion")
+
+    # Single-flight : 5 questions identiques concurrentes -> 1 appel amont
+    before = len(server.requests)
+    answers = await asyncio.gather(*[collect(llm, "annonce") for _ in range(5)])
+    assert answers == ["".join(TOKENS)] * 5
+    assert len(server.requests) == before + 1
+    print("OK  coalescing : 5 abonnés, 1 appel amont")
+
+    # Abandon : l'appel amont est annulé et la réponse HTTP fermée
+    gen = llm.stream_llm("system", "abandon", 0.2)
+    assert await gen.__anext__() == TOKENS[0]
+    await gen.aclose()
+    await asyncio.sleep(0.5)
+    assert not llm._inflight
+    assert server.aborted == 1, f"aborted={server.aborted}"
+    print("OK  annulation : flux amont fermé après départ du dernier abonné")
+
+    await llm.http_client.aclose()
+
+
+def main() -> int:
+    server = start_stub()
+    os.environ["OPENROUTER_BASE_URL"] = f"http://127.0.0.1:{server.server_port}"
+    os.environ["OPENROUTER_API_KEY"] = "stub"
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+    import llm
+
+    asyncio.run(run_checks(llm, server))
+    server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
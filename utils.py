@@ -1,4 +1,8 @@
-from typing import List, Optional
+from typing import List, Optional, Tuple
+from datetime import datetime
+from sqlalchemy import func, or_, and_
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import aliased
 from sqlmodel import Session, select
 
 from models import Conversation, Message
@@ -10,13 +14,74 @@ def create_conversation(session: Session, user_id: int, title: str = "Nouvelle c
     session.refresh(conv)
     return conv
 
-def list_conversations(session: Session, user_id: int) -> List[Conversation]:
+def encode_cursor(last_activity: datetime, conversation_id: int) -> str:
+    return f"{last_activity.isoformat()}|{conversation_id}"
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    ts, conv_id = cursor.rsplit("|", 1)
+    return datetime.fromisoformat(ts), int(conv_id)
+
+def list_conversations(
+    session: Session,
+    user_id: int,
+    limit: int = 30,
+    cursor: Optional[str] = None,
+    preview_length: int = 120,
+) -> Tuple[List[Row], Optional[str]]:
+    """
+    Conversations triées par dernière activité, avec aperçu du dernier message,
+    nombre de messages et date du dernier message, en une seule requête.
+    Pagination par curseur (keyset) sur (dernière activité, id).
+    """
+    stats = (
+        select(
+            Message.conversation_id.label("conversation_id"),
+            func.count(Message.id).label("message_count"),
+            func.max(Message.id).label("last_message_id"),
+        )
+        .join(Conversation, Conversation.id == Message.conversation_id)
+        .where(Conversation.user_id == user_id)
+        .group_by(Message.conversation_id)
+        .subquery()
+    )
+    last_msg = aliased(Message)
+    last_activity = func.coalesce(last_msg.created_at, Conversation.created_at).label("last_activity")
+
     statement = (
-        select(Conversation)
+        select(
+            Conversation.id,
+            Conversation.title,
+            func.coalesce(stats.c.message_count, 0).label("message_count"),
+            func.substr(last_msg.content, 1, preview_length).label("last_message_preview"),
+            last_msg.created_at.label("last_message_at"),
+            last_activity,
+        )
+        .outerjoin(stats, stats.c.conversation_id == Conversation.id)
+        .outerjoin(last_msg, last_msg.id == stats.c.last_message_id)
         .where(Conversation.user_id == user_id)
-        .order_by(Conversation.id.desc())
     )
-    return session.exec(statement).all()
+
+    if cursor:
+        cursor_at, cursor_id = decode_cursor(cursor)
+        statement = statement.where(
+            or_(
+                last_activity < cursor_at,
+                and_(last_activity == cursor_at, Conversation.id < cursor_id),
+            )
+        )
+
+    statement = statement.order_by(last_activity.desc(), Conversation.id.desc()).limit(limit + 1)
+    rows = session.exec(statement).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].last_activity, rows[-1].id)
+    return rows, next_cursor
+
+def count_conversations(session: Session, user_id: int) -> int:
+    statement = select(func.count(Conversation.id)).where(Conversation.user_id == user_id)
+    return session.exec(statement).one()
 
 def get_conversation(session: Session, user_id: int, conversation_id: int) -> Optional[Conversation]:
     conv = session.get(Conversation, conversation_id)